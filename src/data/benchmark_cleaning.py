@@ -0,0 +1,76 @@
+# date: 2026-10-19
+
+"""
+This script generates a synthetic dataset with the raw columns used by data_cleaning.py and times the column transforms
+in a single process and on a pool of worker processes. It checks that both give the same result and prints the speedup.
+Each mode is timed in a fresh process, like a real data_cleaning.py --jobs=<jobs> run, so the timings include the setup
+every run pays, e.g. building the gender detector once in the single process or once in every worker.
+Generating the synthetic dataset is not timed.
+
+Usage: benchmark_cleaning.py [--rows=<rows>] [--jobs=<jobs>]
+
+Options:
+--rows=<rows>   Number of rows in the synthetic dataset. [default: 200000]
+--jobs=<jobs>   Number of worker processes. [default: 4]
+
+"""
+
+import time
+import multiprocessing
+import numpy as np
+import pandas as pd
+from docopt import docopt
+from data_cleaning import transform_columns
+
+
+def make_synthetic_df(rows, seed=123):
+    rng = np.random.default_rng(seed)
+    sites = ["facebook_IG_plus", "Instagram_Feed", "googleshopping", "bing", "pinterest", "newsletter"]
+    note_attributes = ["" if site == "newsletter" else
+                       "First Visit: https://riversol.com/?utm_source=" + site +
+                       "&utm_medium=paid, Order Url: https://riversol.com/cart;"
+                       for site in rng.choice(sites, rows)]
+    products = ["Sample - Anti-Aging Serum (Normal to Dry)", "Sample - Redness Relief Cream (Very Oily)",
+                "Sample - Anti-Aging Moisturizer (Combination)", "Sample - Cleanser", "Sample Kit / Normal / Oily"]
+    dates = pd.Timestamp("2018-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 3 * 365 * 24 * 3600, rows), unit="s")
+    return pd.DataFrame({
+        "note_attributes": note_attributes,
+        "first_name": rng.choice(["Mary", "John", "Alex", "Sam", "Jennifer", "Wei", "Priya", ""], rows),
+        "default_address_province": rng.choice(["Ontario", "British Columbia ", "Alberta", "Quebec", ""], rows),
+        "default_address_country": rng.choice(["Canada", "United States", "Canada "], rows),
+        "ordered_at": [date.isoformat() for date in dates],
+        "name": rng.choice(products, rows)
+    })
+
+
+def timed_run(rows, jobs, queue):
+    df = make_synthetic_df(rows)
+    start = time.perf_counter()
+    result = transform_columns(df, jobs)
+    queue.put((time.perf_counter() - start, result))
+
+
+def run_in_fresh_process(rows, jobs):
+    # spawn so nothing built by an earlier run (e.g. the gender detector) is inherited
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=timed_run, args=(rows, jobs, queue))
+    process.start()
+    seconds, result = queue.get()
+    process.join()
+    return seconds, result
+
+
+def main(rows, jobs):
+    serial_time, serial = run_in_fresh_process(int(rows), 1)
+    parallel_time, parallel = run_in_fresh_process(int(rows), int(jobs))
+    pd.testing.assert_frame_equal(serial, parallel)
+    print(f"rows: {rows}, jobs: {jobs}")
+    print(f"1 process: {serial_time:.2f}s")
+    print(f"{jobs} processes: {parallel_time:.2f}s")
+    print(f"speedup: {serial_time / parallel_time:.2f}x")
+
+
+if __name__ == "__main__":
+    opt = docopt(__doc__)
+    main(opt["--rows"], opt["--jobs"])
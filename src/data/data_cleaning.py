@@ -6,7 +6,10 @@ This script extracts every customer's first order from the shopify_orders
 and then match it to every customer by their unique client number. Then it will remove useless info
 and extract important info from selected features. Then it will export the clean data for the classification model.
 
-Usage: data_cleaning.py --dbname=<dbname> --user=<user> --password=<password> --host=<host> --out_dir=<out_dir>
+The transforms that only depend on a single column (first visit website, gender, province and country names,
+order date, product and skin type) are run on a pool of --jobs worker processes, every worker gets one shard of one column.
+
+Usage: data_cleaning.py --dbname=<dbname> --user=<user> --password=<password> --host=<host> --out_dir=<out_dir> [--jobs=<jobs>]
 
 Options:
 --dbname=<dbname>          Database name (riversol_TEST_DB).
@@ -14,6 +17,7 @@ Options:
 --password=<password>      Password for the user name.
 --host=<host>              host(IP address).
 --out_dir=<out_dir>        Path to directory where cleaned data will be exported.
+--jobs=<jobs>              Number of worker processes for the column transforms. [default: 1]
 
 """
 
@@ -21,9 +25,14 @@ import psycopg2
 import pandas as pd
 import numpy as np
 import re
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from docopt import docopt
 import gender_guesser.detector as gender
 
+# built on first use, so every worker process loads the name list only once
+_detector = None
+
 def get_website(text, target): #target = "First Visit" or "Order Url"
     if text == None:
         return None
@@ -100,9 +109,73 @@ def buy_or_not(cid, purchaser):
     else:
         return False
 
-opt = docopt(__doc__)
+def get_fv_site(text):
+    website = get_website(text, "First Visit")
+    if website == None:
+        website = "unknown"
+    return generalize_campaign(website)
+
+def get_gender(name):
+    global _detector
+    if _detector == None:
+        _detector = gender.Detector()
+    return _detector.get_gender(name)
+
+def map_column(func, column, values):
+    return {column: [func(value) for value in values]}
+
+def get_product_and_skin_type(values):
+    return {"product_type": [get_product_type(name) for name in values],
+            "skin_type": [get_skin_type(name) for name in values]}
+
+def decompose_dates(values):
+    dates = pd.to_datetime(pd.Series(values), utc=True).dt.date
+    return {"ordered_at": list(dates),
+            "ordered_month": [date.month for date in dates],
+            "ordered_year": [date.year for date in dates]}
+
+# (input column, transform) pairs that are independent of each other and of the other rows,
+# every transform takes a list of values and returns a dict of output column -> list of values
+column_transforms = [
+    ('note_attributes', partial(map_column, get_fv_site, 'fv_site')),
+    ('first_name', partial(map_column, get_gender, 'gender')),
+    ('default_address_province', partial(map_column, standardize_name, 'default_address_province')),
+    ('default_address_country', partial(map_column, standardize_name, 'default_address_country')),
+    ('ordered_at', decompose_dates),
+    ('name', get_product_and_skin_type)
+]
+
+def apply_transform(transform, values):
+    return transform(values)
 
-def main(dbname, user, password, host, out_dir):
+def transform_columns(df, jobs=1):
+    """Run column_transforms on df, split into row shards over jobs worker processes.
+    Only the shard of the input column is sent to a worker, never the whole frame."""
+    jobs = int(jobs)
+    if jobs < 1:
+        raise ValueError(f"--jobs must be at least 1, got {jobs}.")
+    bounds = np.linspace(0, len(df), jobs + 1).astype(int)
+    transforms, shards = [], []
+    for column, transform in column_transforms:
+        values = df[column].tolist()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            transforms.append(transform)
+            shards.append(values[start:end])
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(apply_transform, transforms, shards))
+    else:
+        results = [apply_transform(transform, shard) for transform, shard in zip(transforms, shards)]
+    # shards come back in order, so concatenating them restores the row order
+    outputs = {}
+    for result in results:
+        for column, values in result.items():
+            outputs.setdefault(column, []).extend(values)
+    for column, values in outputs.items():
+        df[column] = values
+    return df
+
+def main(dbname, user, password, host, out_dir, jobs=1):
     # get row data from tables
     sql = \
     """
@@ -184,32 +257,15 @@ def main(dbname, user, password, host, out_dir):
     # create y-variable of whether or not customers made at least 1 purchase after taking sample
     df["maybe_buy"] = df["orders_count"]>1
     
-    # get first interaction website and first order webesite
-    df['fv_site'] = df[['note_attributes']].applymap(lambda text: get_website(text, "First Visit"))
+    # get first interaction campaign website, gender from first name, standardized province and country names,
+    # date, month and year of the first order, product type and skin type from the product name
+    df = transform_columns(df, jobs)
 
-    # get gender from first name
-    d = gender.Detector()
-    df['gender'] = df[['first_name']].applymap(lambda name: d.get_gender(name))
-
-    # standardize province and country names
-    df["default_address_province"] = df[['default_address_province']].applymap(lambda name: standardize_name(name))
-    df["default_address_country"] = df[['default_address_country']].applymap(lambda name: standardize_name(name))
     df["location"] = df["default_address_province"] +", "+ df["default_address_country"]
     df.loc[df['location'] == "NEWFOUNDLAND AND LABRADOR, CANADA", ['location']] = "NEWFOUNDLAND, CANADA"
-    
-    # add month and year of the first order
-    df["ordered_at"] = pd.to_datetime(df["ordered_at"], utc=True).dt.date
-    df["ordered_month"] = df[["ordered_at"]].applymap(lambda time: time.month)
-    df["ordered_year"] = df[["ordered_at"]].applymap(lambda time: time.year)
     newest = max(df['ordered_at'])
     df["days_from_sample"] = df[["ordered_at"]].applymap(lambda date: (newest-date).days)
 
-    # apply product type categorization to all rows
-    df['product_type'] = df[['name']].applymap(lambda name: get_product_type(name))
-
-    # categorize skin types based on product name information
-    df['skin_type'] = df[['name']].applymap(lambda name: get_skin_type(name))
-    
     # if the first order was at not charge (free shipping)
     df["free_shipping"] = df["total_price"]==0
             
@@ -217,9 +273,6 @@ def main(dbname, user, password, host, out_dir):
     for i in df.columns:
         df[i] = df[i].replace({np.nan:"unknown"})
         
-    # extract campaign website
-    df["fv_site"] = df[['fv_site']].applymap(lambda campaign: generalize_campaign(campaign))
-        
     # remove tags with fraud, test, retailer, and scammer
     df = df[~df['tags'].str.contains('FRAUD|test|Retailer|Scammer', regex = True)]
     df = df[~df['order_tag'].str.contains('(?i)ws_order|wholesale', regex = True, na = False)]
@@ -242,4 +295,5 @@ def main(dbname, user, password, host, out_dir):
         print(f"Directory does not exist. Exception: {e}")
 
 if __name__ == "__main__":
-    main(opt["--dbname"], opt["--user"], opt["--password"], opt["--host"], opt["--out_dir"])
+    opt = docopt(__doc__)
+    main(opt["--dbname"], opt["--user"], opt["--password"], opt["--host"], opt["--out_dir"], opt["--jobs"])
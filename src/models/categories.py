@@ -0,0 +1,43 @@
+# date: 2026-10-19
+
+"""
+Category keys shared by the model training, the model registry metadata and the drift monitor.
+Every feature value is turned into the same string key, so the vocabularies of the models
+and the category counts of the training and scoring data can be compared with each other.
+"""
+
+import pandas as pd
+
+categorical_features = ['accepts_marketing', 'ordered_month', 'gender', 'free_shipping',
+                        'product_type', 'skin_type', 'location', 'fv_site']
+
+
+def category_key(value):
+    """Turn a feature value into the string used in the vocabulary, missing values become 'unknown'."""
+    if pd.isna(value):
+        return 'unknown'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def count_categories(X, features=categorical_features):
+    """Count every category of every feature in X, using the same keys as the model vocabularies."""
+    profile = {}
+    for feature in features:
+        counts = {}
+        # only the distinct values go through category_key, not every row
+        for value, n in X[feature].value_counts(dropna=False).items():
+            key = category_key(value)
+            counts[key] = counts.get(key, 0) + int(n)
+        profile[feature] = counts
+    return profile
+
+
+def merge_counts(total, profile):
+    """Add the counts of profile to total in place."""
+    for feature, counts in profile.items():
+        feature_total = total.setdefault(feature, {})
+        for category, n in counts.items():
+            feature_total[category] = feature_total.get(category, 0) + n
+    return total
@@ -3,14 +3,21 @@
 
 """
 This script takes the cleaned dataset as the input, split the dataset into train, valid, and test sets and export them.
-And then it will train the model using the training dataset and save the model.
+And then it will train the model using the training dataset and save the model as a new version in the model registry
+(see model_registry.py), together with its validation metrics and the category counts of the training data,
+and promote it so predict.py and result.py use it.
 This script assumes the input cleaned dataset is the result from running the data_cleaning.py.
 
-Usage: clf_model.py --input=<input> --out_dir=<out_dir>
+With --chunksize the cleaned data is streamed in chunks of that many rows and the model is trained out of core
+(see out_of_core.py), so the whole dataset never has to fit in memory.
+
+Usage: clf_model.py --input=<input> --out_dir=<out_dir> [--chunksize=<chunksize>] [--registry=<registry>]
 
 Options:
---input=<input>     Path (including filename) to the cleaned data.
---out_dir=<out_dir> Path to directory where the separated dataset and model will be saved.
+--input=<input>             Path (including filename) to the cleaned data.
+--out_dir=<out_dir>         Path to directory where the separated dataset and model will be saved.
+--chunksize=<chunksize>     Number of rows to read at a time for out-of-core training.
+--registry=<registry>       Path to the model registry directory. [default: models/registry]
             
 """
 
@@ -21,14 +28,38 @@ from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import LabelEncoder, OneHotEncoder, LabelBinarizer
+from sklearn.metrics import precision_recall_fscore_support
 from sklearn.utils.validation import column_or_1d
 from xgboost import XGBClassifier
-import pickle
+import os
+import out_of_core
+from categories import category_key, count_categories
+import model_registry
 
 opt = docopt(__doc__)
 
 
-def main(input, out_dir):
+def save_model(clf, registry, input, metrics, vocabularies, profile):
+    metadata = {'training_data': input,
+                'training_data_sha256': model_registry.file_hash(input),
+                'metrics': metrics,
+                'vocabularies': vocabularies,
+                'profile': profile}
+    version = model_registry.register(clf, registry, metadata)
+    model_registry.promote(registry, version)
+    print(f"Registered and promoted model {version} in {registry}")
+
+
+def main(input, out_dir, chunksize=None, registry="models/registry"):
+    if chunksize is not None:
+        # the splits are written while streaming, so check the directory before training
+        if not os.path.isdir(out_dir):
+            print(f"Directory does not exist: {out_dir}")
+            return
+        clf, profile = out_of_core.train(input, out_dir, chunksize)
+        metrics = out_of_core.evaluate(clf, out_dir + "/valid_df.csv", chunksize)
+        save_model(clf, registry, input, metrics, clf.vocabularies(), profile)
+        return
     # load cleaned dataframe
     df = pd.read_csv(input)
     df = df[~((df["days_from_sample"]<46) & (df["buy"]==False))]
@@ -59,8 +90,12 @@ def main(input, out_dir):
     clf = Pipeline(steps = [('preprocessor', preprocessor),
                                 ('classifier', model)])
     clf.fit(X_train, y_train)
-    filename = 'finalized_model.sav'
-    pickle.dump(clf, open(filename, 'wb'))
+    precision, recall, f1, _ = precision_recall_fscore_support(y_valid, clf.predict(X_valid), average='binary')
+    metrics = {'precision': float(precision), 'recall': float(recall), 'f1': float(f1), 'support': int(y_valid.sum())}
+    categories = clf.named_steps['preprocessor'].named_transformers_['cat'].named_steps['onehot'].categories_
+    vocabularies = {feature: [category_key(category) for category in feature_categories]
+                    for feature, feature_categories in zip(categorical_features, categories)}
+    save_model(clf, registry, input, metrics, vocabularies, count_categories(X_train, categorical_features))
     # save train valid and test as .csv files
     try:
         train_df.to_csv(out_dir + "/train_df.csv", index=False)
@@ -72,5 +107,5 @@ def main(input, out_dir):
 
 
 if __name__ == "__main__":
-    main(opt["--input"], opt["--out_dir"])
+    main(opt["--input"], opt["--out_dir"], opt["--chunksize"], opt["--registry"])
 
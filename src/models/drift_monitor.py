@@ -0,0 +1,114 @@
+# date: 2026-10-19
+
+"""
+This script compares the category distributions of new sample takers with the ones the model was trained on.
+For every categorical feature it reports the share of values that were never seen in training
+(the one-hot encoder silently ignores them) and the population stability index (PSI) against the training profile.
+The monitor only keeps one count per training category and one for all unseen categories, so its memory does not grow
+with the number of rows and it can run on every scoring batch, predict.py uses it after every prediction.
+Run directly, it streams the input in batches and compares it with the training data (train_df.csv).
+
+Usage: drift_monitor.py --train=<train> --input=<input> --out_dir=<out_dir> [--chunksize=<chunksize>]
+
+Options:
+--train=<train>             Path (including filename) to the training data the model was fit on.
+--input=<input>             Path (including filename) to the data to compare with the training data.
+--out_dir=<out_dir>         Path to directory where the drift report will be saved.
+--chunksize=<chunksize>     Number of rows to read at a time. [default: 100000]
+
+"""
+
+import numpy as np
+import pandas as pd
+from docopt import docopt
+from categories import count_categories, merge_counts
+
+# usual rule of thumb: below 0.1 no shift, above 0.25 a significant shift
+psi_warn = 0.1
+psi_drift = 0.25
+# proportion used instead of 0 so the PSI stays finite
+epsilon = 1e-4
+
+
+def profile_from_csv(path, chunksize):
+    """Training profile built from a csv file read chunk by chunk."""
+    profile = {}
+    for chunk in pd.read_csv(path, chunksize=int(chunksize)):
+        merge_counts(profile, count_categories(chunk))
+    return profile
+
+
+def psi(expected, actual):
+    """Population stability index between two arrays of proportions."""
+    expected = np.maximum(expected, epsilon)
+    actual = np.maximum(actual, epsilon)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """Keep streaming category counts of the scored data and compare them with the training profile."""
+
+    def __init__(self, profile):
+        self.categories = {feature: list(counts) for feature, counts in profile.items()}
+        self.expected = {}
+        for feature, counts in profile.items():
+            n = np.array(list(counts.values()), dtype=float)
+            # the last entry is the bucket of categories unseen in training
+            self.expected[feature] = np.append(n / n.sum(), 0)
+        self.index = {feature: {category: i for i, category in enumerate(categories)}
+                      for feature, categories in self.categories.items()}
+        self.counts = {feature: np.zeros(len(categories) + 1) for feature, categories in self.categories.items()}
+        self.rows = 0
+        self.batches = 0
+
+    def _batch_counts(self, X):
+        batch = {}
+        for feature, counts in count_categories(X, self.categories).items():
+            index = self.index[feature]
+            unknown = len(index)
+            n = np.zeros(unknown + 1)
+            for category, count in counts.items():
+                n[index.get(category, unknown)] += count
+            batch[feature] = n
+        return batch
+
+    def _report(self, counts, rows):
+        report = []
+        for feature, n in counts.items():
+            value = psi(self.expected[feature], n / rows) if rows else 0.0
+            report.append({'feature': feature,
+                           'rows': rows,
+                           'unknown_rate': n[-1] / rows if rows else 0.0,
+                           'psi': value,
+                           'status': 'drift' if value > psi_drift else 'warn' if value > psi_warn else 'ok'})
+        return pd.DataFrame(report)
+
+    def update(self, X):
+        """Add a scoring batch to the running counts and return the report of that batch alone."""
+        batch = self._batch_counts(X)
+        for feature, n in batch.items():
+            self.counts[feature] += n
+        self.rows += len(X)
+        self.batches += 1
+        return self._report(batch, len(X))
+
+    def report(self):
+        """Report of every batch seen so far."""
+        return self._report(self.counts, self.rows)
+
+
+def main(train, input, out_dir, chunksize):
+    monitor = DriftMonitor(profile_from_csv(train, chunksize))
+    for chunk in pd.read_csv(input, chunksize=int(chunksize)):
+        monitor.update(chunk)
+    report = monitor.report()
+    print(report.to_string(index=False))
+    try:
+        report.to_csv(out_dir + "/drift_report.csv", index=False)
+    except Exception as e:
+        print(f"Directory does not exist. Exception: {e}")
+
+
+if __name__ == "__main__":
+    opt = docopt(__doc__)
+    main(opt["--train"], opt["--input"], opt["--out_dir"], opt["--chunksize"])
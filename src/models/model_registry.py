@@ -0,0 +1,141 @@
+# date: 2026-10-19
+
+"""
+This script keeps a local registry of the trained models.
+Every model registered by clf_model.py gets its own version directory with the pickled model and its metadata
+(hash of the training data, metrics on the validation set and the feature vocabularies),
+and the CURRENT file points to the version that predict.py and result.py should use.
+Promoting a version only rewrites the CURRENT file, so consumers pick up the new model on their next load
+without restarting, and load_model keeps the current model in memory so it is only deserialized once per version.
+
+Usage: model_registry.py list [--registry=<registry>]
+       model_registry.py promote <version> [--registry=<registry>]
+
+Options:
+--registry=<registry>   Path to the model registry directory. [default: models/registry]
+
+"""
+
+import errno
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime
+
+from docopt import docopt
+
+# (registry, version) -> model, and registry -> version that was current when the cache was filled
+_cache = {}
+_promoted = {}
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in blocks so large training data does not have to fit in memory."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def list_versions(registry):
+    """Registered versions, oldest first."""
+    if not os.path.isdir(registry):
+        return []
+    versions = [name for name in os.listdir(registry)
+                if name.startswith('v') and name[1:].isdigit() and os.path.isdir(os.path.join(registry, name))]
+    return sorted(versions, key=lambda name: int(name[1:]))
+
+
+def current_version(registry):
+    """Version the CURRENT file points to, or None if nothing was promoted yet."""
+    try:
+        with open(os.path.join(registry, 'CURRENT')) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def register(model, registry, metadata):
+    """Save the model and its metadata as a new version and return the version name."""
+    os.makedirs(registry, exist_ok=True)
+    # write into a temporary directory first so a half written version is never visible
+    tmp_dir = tempfile.mkdtemp(dir=registry, prefix='.tmp')
+    # mkdtemp only lets the owner in, scoring jobs running as another user have to read the version too
+    os.chmod(tmp_dir, 0o755)
+    try:
+        with open(os.path.join(tmp_dir, 'model.sav'), 'wb') as f:
+            pickle.dump(model, f)
+        while True:
+            versions = list_versions(registry)
+            version = 'v' + str(int(versions[-1][1:]) + 1 if versions else 1)
+            metadata = dict(metadata, version=version, created_at=datetime.now().isoformat(timespec='seconds'))
+            with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            try:
+                os.rename(tmp_dir, os.path.join(registry, version))
+                return version
+            except OSError as e:
+                # another training run registered the same version first, try the next one
+                if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                    raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def promote(registry, version):
+    """Atomically point CURRENT to the given version."""
+    if version not in list_versions(registry):
+        raise ValueError(f"Version {version} is not in the registry {registry}.")
+    tmp_path = os.path.join(registry, 'CURRENT.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(registry, 'CURRENT'))
+
+
+def load_metadata(registry, version=None):
+    """Metadata of the given version, the current one by default."""
+    version = version or current_version(registry)
+    if version is None:
+        raise FileNotFoundError(f"No model has been promoted in the registry {registry}, train one with clf_model.py first.")
+    with open(os.path.join(registry, version, 'metadata.json')) as f:
+        return json.load(f)
+
+
+def load_model(registry, version=None):
+    """Load the given version, the current one by default.
+    Every loaded version is kept in memory, so it is only deserialized once,
+    and the cached versions of the registry are dropped when a different version is promoted."""
+    root = os.path.abspath(registry)
+    current = current_version(registry)
+    if _promoted.get(root, current) != current:
+        for key in [key for key in _cache if key[0] == root]:
+            del _cache[key]
+    _promoted[root] = current
+    version = version or current
+    if version is None:
+        raise FileNotFoundError(f"No model has been promoted in the registry {registry}, train one with clf_model.py first.")
+    key = (root, version)
+    if key not in _cache:
+        with open(os.path.join(registry, version, 'model.sav'), 'rb') as f:
+            _cache[key] = pickle.load(f)
+    return _cache[key]
+
+
+def main(opt):
+    registry = opt["--registry"]
+    if opt["promote"]:
+        promote(registry, opt["<version>"])
+        return
+    current = current_version(registry)
+    for version in list_versions(registry):
+        metadata = load_metadata(registry, version)
+        marker = '*' if version == current else ' '
+        print(f"{marker} {version}  {metadata['created_at']}  {metadata['metrics']}")
+
+
+if __name__ == "__main__":
+    main(docopt(__doc__))
@@ -0,0 +1,164 @@
+# date: 2026-10-19
+
+"""
+Helpers for training the classification model out of core.
+The cleaned data is streamed in chunks, every customer is assigned to the train, valid or test set
+by a deterministic hash of their customer_id, categorical features are one-hot encoded with a fixed vocabulary
+and XGBoost is trained through its external memory iterator, so peak memory does not depend on the size of the dataset.
+This module is used by clf_model.py when it is run with --chunksize.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from scipy import sparse
+from categories import categorical_features, category_key, count_categories, merge_counts
+
+# same proportions as the two train_test_split calls in clf_model.py
+test_size = 0.2
+valid_size = 0.4
+
+
+def read_chunks(input, chunksize):
+    """Stream the cleaned data, dropping recent sample takers who have not bought yet."""
+    for chunk in pd.read_csv(input, chunksize=chunksize):
+        yield chunk[~((chunk["days_from_sample"] < 46) & (chunk["buy"] == False))]
+
+
+def assign_split(customer_ids):
+    """Assign every customer to 'train', 'valid' or 'test' from a hash of their customer_id.
+    The hash does not depend on the label, so class proportions are kept approximately in every split."""
+    hashes = pd.util.hash_pandas_object(pd.Series(customer_ids).astype(str), index=False).values
+    buckets = hashes / 2.0 ** 64
+    split = np.full(len(buckets), 'train', dtype=object)
+    split[buckets < test_size + (1 - test_size) * valid_size] = 'valid'
+    split[buckets < test_size] = 'test'
+    return split
+
+
+def build_vocabulary(profile):
+    """Map every (feature, category) pair seen in training to a column of the one-hot matrix."""
+    vocabulary = {}
+    for feature in categorical_features:
+        for category in sorted(profile[feature]):
+            vocabulary[(feature, category)] = len(vocabulary)
+    return vocabulary
+
+
+def encode(X, vocabulary):
+    """One-hot encode X with a fixed vocabulary, unseen categories are ignored."""
+    rows, cols = [], []
+    for feature in categorical_features:
+        # only the distinct values go through category_key, missing values get the code -1
+        codes, uniques = pd.factorize(X[feature])
+        lookup = np.array([vocabulary.get((feature, category_key(value)), -1) for value in uniques] +
+                          [vocabulary.get((feature, 'unknown'), -1)], dtype=np.int64)
+        feature_cols = lookup[codes]
+        seen = feature_cols >= 0
+        rows.append(np.flatnonzero(seen))
+        cols.append(feature_cols[seen])
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+    data = np.ones(len(rows), dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(X), len(vocabulary)))
+
+
+class ChunkIterator(xgb.DataIter):
+    """Feed the encoded chunks of the exported train split to XGBoost one at a time."""
+
+    def __init__(self, input, chunksize, vocabulary, cache_prefix):
+        # input is the train_df.csv written by train, so the rows are already filtered and split
+        self.input = input
+        self.chunksize = chunksize
+        self.vocabulary = vocabulary
+        self.chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self.chunks is None:
+            self.chunks = pd.read_csv(self.input, chunksize=self.chunksize)
+        for chunk in self.chunks:
+            if len(chunk) == 0:
+                continue
+            input_data(data=encode(chunk, self.vocabulary), label=(chunk['buy'] == True).astype(int).values)
+            return 1
+        return 0
+
+    def reset(self):
+        self.chunks = None
+
+
+class ChunkedClassifier:
+    """Booster trained out of core together with the vocabulary needed to encode new data."""
+
+    def __init__(self, booster, vocabulary):
+        self.booster = booster
+        self.vocabulary = vocabulary
+
+    def predict_proba(self, X):
+        prob = self.booster.predict(xgb.DMatrix(encode(X, self.vocabulary)))
+        return np.column_stack([1 - prob, prob])
+
+    def predict(self, X):
+        return self.predict_proba(X)[:, 1] > 0.5
+
+    def vocabularies(self):
+        """Categories seen in training for every feature."""
+        vocabularies = {feature: [] for feature in categorical_features}
+        for feature, category in self.vocabulary:
+            vocabularies[feature].append(category)
+        return vocabularies
+
+
+def evaluate(clf, input, chunksize):
+    """Precision, recall and F1 score of the buy class on a split exported by train, read chunk by chunk."""
+    tp, fp, fn, support = 0, 0, 0, 0
+    for chunk in pd.read_csv(input, chunksize=int(chunksize)):
+        y_true = (chunk['buy'] == True).values
+        y_pred = clf.predict(chunk.drop(columns=['buy']))
+        tp += int((y_pred & y_true).sum())
+        fp += int((y_pred & ~y_true).sum())
+        fn += int((~y_pred & y_true).sum())
+        support += int(y_true.sum())
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1, 'support': support}
+
+
+def train(input, out_dir, chunksize):
+    """Split the cleaned data chunk by chunk, export the splits and fit the model on the train split.
+    Return the model and the category counts of the train split."""
+    chunksize = int(chunksize)
+    profile = {}
+    n_pos, n_neg = 0, 0
+    header = True
+    # first pass: write the splits and collect the training category counts and class balance
+    for chunk in read_chunks(input, chunksize):
+        split = assign_split(chunk['customer_id'])
+        chunk = chunk.drop(columns=['customer_id', 'ordered_year', 'days_from_sample'])
+        for name in ['train', 'valid', 'test']:
+            part = chunk[split == name]
+            part.to_csv(os.path.join(out_dir, name + "_df.csv"), mode='w' if header else 'a',
+                        header=header, index=False)
+        header = False
+        train_part = chunk[split == 'train']
+        merge_counts(profile, count_categories(train_part))
+        n_pos += (train_part['buy'] == True).sum()
+        n_neg += (train_part['buy'] == False).sum()
+
+    vocabulary = build_vocabulary(profile)
+    # second pass: train from the external memory cache built by the iterator,
+    # the cache pages are as large as the training data so they are removed once the model is fit
+    params = {'objective': 'binary:logistic', 'tree_method': 'approx',
+              'scale_pos_weight': n_neg / n_pos}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        iterator = ChunkIterator(os.path.join(out_dir, "train_df.csv"), chunksize, vocabulary,
+                                 os.path.join(cache_dir, "dtrain.cache"))
+        dtrain = xgb.DMatrix(iterator)
+        booster = xgb.train(params, dtrain, num_boost_round=100)
+        del dtrain, iterator
+    return ChunkedClassifier(booster, vocabulary), profile
@@ -4,31 +4,46 @@
 """
 This script takes in a clean format dataframe and predict whether the sample takers in the profile will become paying customers using the model we trained.
 And then it will export a the dataframe with a prediction column called"buy_pred".
+It also compares the category distributions of the input with the training data of the model and exports a drift report
+(see drift_monitor.py).
 This script assumes the input dataset is clean.
 
-Usage: predict.py --input=<input> --out_dir=<out_dir>
+Usage: predict.py --input=<input> --out_dir=<out_dir> [--registry=<registry>]
 
 Options:
---input=<input>     Path (including filename) to the data.
---out_dir=<out_dir> Path to directory where the data with the prediction column will be saved.
+--input=<input>         Path (including filename) to the data.
+--out_dir=<out_dir>     Path to directory where the data with the prediction column will be saved.
+--registry=<registry>   Path to the model registry directory, the promoted model is used. [default: models/registry]
 
 """
 
 from docopt import docopt
 import pandas as pd
-import pickle
+import model_registry
+from drift_monitor import DriftMonitor
 
 opt = docopt(__doc__)
 
-def main(input, out_dir):
+def main(input, out_dir, registry="models/registry"):
     df = pd.read_csv(input)
     X = df[["accepts_marketing", "ordered_month", "location", "gender", "free_shipping", "product_type", "skin_type", "fv_site"]]
-    loaded_model = pickle.load(open('finalized_model.sav', 'rb'))
+    # read CURRENT once so the model and its profile come from the same version even if another one is promoted
+    version = model_registry.current_version(registry)
+    loaded_model = model_registry.load_model(registry, version)
     df["buy_pred"] = loaded_model.predict(X)
+    metadata = model_registry.load_metadata(registry, version)
+    drift_report = None
+    if 'profile' in metadata:
+        drift_report = DriftMonitor(metadata['profile']).update(X)
+        print(drift_report.to_string(index=False))
+    else:
+        print(f"Model {metadata['version']} has no training profile, skipping the drift report.")
     try:
         df.to_csv(out_dir + "/prediction.csv", index=False)
+        if drift_report is not None:
+            drift_report.to_csv(out_dir + "/drift_report.csv", index=False)
     except Exception as e:
         print(f"Directory does not exist. Exception: {e}")
 
 if __name__ == "__main__":
-    main(opt["--input"], opt["--out_dir"])
\ No newline at end of file
+    main(opt["--input"], opt["--out_dir"], opt["--registry"])
\ No newline at end of file
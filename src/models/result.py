@@ -6,11 +6,12 @@ This script takes in the validation/testing data and run the model we train on t
 And then it will export a dataframe including precison, recall, F1 score and number of the sample as well as a confusion matrix.
 This script assumes the input cleaned dataset is the result from running the clf_model.py.
 
-Usage: result.py --input=<input> --out_dir=<out_dir>
+Usage: result.py --input=<input> --out_dir=<out_dir> [--registry=<registry>]
 
 Options:
---input=<input>     Path (including filename) to the testing/validation data.
---out_dir=<out_dir> Path to directory where the dataframe and plot results will be saved.
+--input=<input>         Path (including filename) to the testing/validation data.
+--out_dir=<out_dir>     Path to directory where the dataframe and plot results will be saved.
+--registry=<registry>   Path to the model registry directory, the promoted model is used. [default: models/registry]
 
 """
 
@@ -18,7 +19,7 @@ from docopt import docopt
 import pandas as pd
 import numpy as np
 import seaborn as sns
-import pickle
+import model_registry
 import matplotlib.pyplot as plt
 from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
 
@@ -29,11 +30,11 @@ plt.rcParams.update({'font.size': 16,
                      'axes.labelweight': 'bold',
                      'figure.figsize': (8,6)})
 
-def main(input, out_dir):
+def main(input, out_dir, registry="models/registry"):
     df = pd.read_csv(input)
     X_test = df.drop(columns = ['buy'])
     y_test = df['buy']
-    loaded_model = pickle.load(open('finalized_model.sav', 'rb'))
+    loaded_model = model_registry.load_model(registry)
     y_pred = loaded_model.predict(X_test)
     report = precision_recall_fscore_support(y_test, y_pred)
     model_report = pd.DataFrame(list(report),index=['Precision', 'Recall', 'F1-score', 'Support'], columns=['not_buy', 'buy']).T
@@ -54,4 +55,4 @@ def main(input, out_dir):
 
 
 if __name__ == "__main__":
-    main(opt["--input"], opt["--out_dir"])
+    main(opt["--input"], opt["--out_dir"], opt["--registry"])